@@ -61,6 +61,82 @@ def merge_and_deduplicate_data(file_paths, output_filename=None):
         
     return cleaned_df
 
+def fill_from_detail(merged_df, detail_df):
+    """
+    รวมข้อมูลจาก detail API เข้ากับข้อมูลหลัก โดยข้อมูลหลักมีสิทธิ์ก่อน (combine_first)
+    
+    detail ใช้เติมเฉพาะช่องที่ว่างของ id ที่มีอยู่แล้ว และเพิ่ม id ที่ยังไม่มี
+    
+    Args:
+        merged_df (pd.DataFrame): ข้อมูลหลัก (จาก paginated API) ตัด id ซ้ำแล้ว
+        detail_df (pd.DataFrame): ข้อมูลจาก detail API ตัด id ซ้ำแล้ว
+    
+    Returns:
+        pd.DataFrame: DataFrame ที่รวมแล้ว
+    """
+    # detail API ใช้ชื่อ column 'company_name' (ชื่อภาษาไทย) -> map ให้ตรงกับ paginated
+    detail_df = detail_df.rename(columns={'company_name': 'company_nameTh'})
+    if merged_df.empty:
+        return detail_df.reset_index(drop=True)
+    if detail_df.empty:
+        return merged_df
+    
+    columns = list(merged_df.columns) + [c for c in detail_df.columns if c not in merged_df.columns]
+    combined = merged_df.set_index('id').combine_first(detail_df.set_index('id'))
+    return combined.reset_index()[columns]
+
+def prepare_dataset(file_paths):
+    """
+    Merge ไฟล์ CSV แล้วสร้าง column ที่แท็บ Visualize / Bookmark ใช้
+    (student_draft_ratio, salary ต่อวัน และ trend จาก scrape history)
+    
+    Args:
+        file_paths (list): รายชื่อ path ของไฟล์ .csv ที่ต้องการรวม
+    
+    Returns:
+        pd.DataFrame: DataFrame ที่พร้อมใช้งาน (ว่างถ้าอ่านไฟล์ไม่ได้เลย)
+    """
+    # แยกไฟล์จาก detail API (ไม่มี inStudentDraftCount) ออกมา ให้ใช้เติมเฉพาะค่าที่ขาด
+    # ไม่ทับแถวจาก paginated API ที่มีข้อมูลครบกว่า
+    paginated_files, detail_files = [], []
+    for file in file_paths:
+        try:
+            is_detail = 'inStudentDraftCount' not in pd.read_csv(file, nrows=0).columns
+        except Exception:
+            is_detail = False  # ให้ merge_and_deduplicate_data เป็นคน log error / skip
+        (detail_files if is_detail else paginated_files).append(file)
+    
+    merged_df = merge_and_deduplicate_data(paginated_files) if paginated_files else pd.DataFrame()
+    if detail_files:
+        detail_df = merge_and_deduplicate_data(detail_files)
+        merged_df = fill_from_detail(merged_df, detail_df)
+    if merged_df.empty:
+        return merged_df
+    
+    # detail API ไม่มี inStudentDraftCount -> เว้นว่างไว้ก่อน ให้ history_metrics เติมจาก snapshot ล่าสุดได้
+    if 'inStudentDraftCount' not in merged_df.columns:
+        merged_df['inStudentDraftCount'] = np.nan
+    merged_df['quota'] = merged_df['quota'].fillna(1)  # เติม 1 เพื่อหลีกเลี่ยงการหารด้วยศูนย์
+    
+    # Draft-count trend from scrape history (projected ratio at End Date)
+    # ต้องคำนวณก่อน fillna(0) ของ inStudentDraftCount
+    from Helper.history import load_history, history_metrics
+    metrics = history_metrics(load_history(), merged_df)
+    merged_df[metrics.columns] = metrics
+    
+    # create column student_draft_ratio
+    merged_df['inStudentDraftCount'] = merged_df['inStudentDraftCount'].fillna(0)
+    merged_df['student_draft_ratio'] = merged_df['inStudentDraftCount']/merged_df['quota']
+    
+    # Normalize salary_amount to per day if salary_type indicates monthly or fixed
+    # แปลงเป็น float ก่อน (pandas รุ่นใหม่ไม่ยอมให้เขียนค่าทศนิยมลง column int64)
+    merged_df['salary_amount'] = pd.to_numeric(merged_df['salary_amount'], errors='coerce').astype(float)
+    mask = merged_df['salary_type'].str.contains('บาท/เดือน', na=False, case=False) | merged_df['salary_type'].str.contains('เหมาจ่าย', na=False, case=False)
+    merged_df.loc[mask, 'salary_amount'] = merged_df.loc[mask, 'salary_amount'] / 22
+    merged_df.loc[mask, 'salary_amount'] = merged_df.loc[mask, 'salary_amount'].round(0)
+    
+    return merged_df
+
 def log_data_stats(df, column_name):
     """
     ฟังก์ชันสำหรับวิเคราะห์สถิติและพล็อตกราฟ
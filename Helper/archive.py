@@ -0,0 +1,265 @@
+import argparse
+import csv
+import gzip
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# zstd บีบอัดได้เร็วและเล็กกว่า แต่เป็น optional dependency -> ถ้าไม่มีจะใช้ gzip แทน
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_DIR = "raw_archive"
+INDEX_FILENAME = "index.csv"
+INDEX_COLUMNS = ["opening_id", "fetched_at", "source", "url", "segment", "record_no"]
+SOURCES = ("paginated", "detail")
+
+
+def _open_segment(path, mode):
+    """เปิดไฟล์ segment (.jsonl.zst หรือ .jsonl.gz) แบบ text mode"""
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError(f"Segment {path} needs the 'zstandard' package to read.")
+        return zstandard.open(path, mode + "t", encoding="utf-8")
+    return gzip.open(path, mode + "t", encoding="utf-8")
+
+
+def _create_index(index_path):
+    """
+    สร้าง index.csv พร้อม header แบบ atomic (ถ้ามีอยู่แล้วไม่ทำอะไร)
+
+    เขียน header ลงไฟล์ชั่วคราวแล้ว os.link ไปที่ index.csv ซึ่งจะ fail ถ้ามีไฟล์อยู่แล้ว
+    ทำให้ scrape ที่เริ่มพร้อมกันไม่เขียน header ซ้ำ และไม่มีใคร append แถวก่อน header
+    """
+    if os.path.exists(index_path):
+        return
+    tmp_path = f"{index_path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(INDEX_COLUMNS)
+    try:
+        os.link(tmp_path, index_path)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp_path)
+
+
+class ArchiveWriter:
+    """
+    เขียน raw API response ลง archive แบบ append-only
+
+    ทุกครั้งที่สร้าง writer จะได้ segment ไฟล์ใหม่ (segment เก่าจะไม่ถูกแก้ไขอีก)
+    และเพิ่มแถวใน index.csv ต่อ opening ID ที่อยู่ใน response นั้น
+
+    Example:
+        with ArchiveWriter(source="detail") as archive:
+            archive.write(url, response.json(), [job_id])
+    """
+
+    def __init__(self, archive_dir=ARCHIVE_DIR, source="detail"):
+        if source not in SOURCES:
+            raise ValueError(f"Unknown archive source '{source}', expected one of {SOURCES}")
+        os.makedirs(archive_dir, exist_ok=True)
+
+        suffix = ".jsonl.zst" if zstandard is not None else ".jsonl.gz"
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        self.source = source
+        self.segment = f"{source}_{stamp}_{os.getpid()}{suffix}"
+        self.record_no = 0
+
+        self._segment_file = _open_segment(os.path.join(archive_dir, self.segment), "w")
+
+        index_path = os.path.join(archive_dir, INDEX_FILENAME)
+        _create_index(index_path)
+        self._index_file = open(index_path, "a", newline="", encoding="utf-8")
+        self._index_writer = csv.writer(self._index_file)
+
+    def write(self, url, data, opening_ids):
+        """
+        บันทึก response หนึ่งรายการ
+
+        Args:
+            url (str): URL ที่ยิง request
+            data (dict): JSON ที่ได้จาก API (เก็บทั้งก้อนไม่ตัด field)
+            opening_ids (list): opening ID ทั้งหมดที่อยู่ใน response นี้
+        """
+        fetched_at = datetime.now(timezone.utc).isoformat()
+        record = {
+            "fetched_at": fetched_at,
+            "source": self.source,
+            "url": url,
+            "opening_ids": list(opening_ids),
+            "data": data,
+        }
+        self._segment_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # flush record ลง segment ก่อนเขียน index เพื่อไม่ให้ index ชี้ไปที่ record ที่ยังไม่ถูกเขียน
+        self._segment_file.flush()
+
+        for opening_id in opening_ids:
+            self._index_writer.writerow([opening_id, fetched_at, self.source, url, self.segment, self.record_no])
+        self._index_file.flush()
+        self.record_no += 1
+
+    def close(self):
+        self._segment_file.close()
+        self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def list_segments(archive_dir=ARCHIVE_DIR, source=None):
+    """รายชื่อ segment เรียงตามเวลาที่สร้าง (ชื่อไฟล์มี timestamp อยู่แล้ว)"""
+    if not os.path.isdir(archive_dir):
+        return []
+
+    def created_at(name):
+        # ชื่อไฟล์: {source}_{timestamp}_{pid}.jsonl.(zst|gz)
+        return name.split("_")[1]
+
+    segments = [
+        name for name in os.listdir(archive_dir)
+        if name.endswith((".jsonl.zst", ".jsonl.gz"))
+        and (source is None or name.startswith(f"{source}_"))
+    ]
+    return sorted(segments, key=created_at)
+
+
+def iter_segment(path):
+    """อ่าน record ทีละบรรทัดจาก segment (ถ้าไฟล์ท้ายขาดเพราะ scrape ถูกหยุดกลางคัน จะอ่านเท่าที่อ่านได้)"""
+    try:
+        with _open_segment(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    except (EOFError, json.JSONDecodeError) as e:
+        print(f"[WARN] Truncated archive segment {path}: {e}")
+
+
+def iter_archive(archive_dir=ARCHIVE_DIR, source=None):
+    """วนอ่านทุก record ใน archive ตามลำดับเวลาที่ fetch"""
+    for segment in list_segments(archive_dir, source):
+        yield from iter_segment(os.path.join(archive_dir, segment))
+
+
+def read_index(archive_dir=ARCHIVE_DIR):
+    """อ่าน index.csv เป็น DataFrame (opening_id, fetched_at, source, url, segment, record_no)"""
+    index_path = os.path.join(archive_dir, INDEX_FILENAME)
+    if not os.path.exists(index_path):
+        return pd.DataFrame(columns=INDEX_COLUMNS)
+    return pd.read_csv(index_path)
+
+
+def load_opening_records(opening_id, archive_dir=ARCHIVE_DIR):
+    """
+    ดึง raw response ทุกครั้งที่เคย fetch ของ opening หนึ่ง โดยเปิดเฉพาะ segment ที่ index ชี้ไป
+
+    Returns:
+        list: record (dict) เรียงตาม fetched_at
+    """
+    index = read_index(archive_dir)
+    hits = index[index["opening_id"] == opening_id].sort_values("fetched_at")
+
+    records = []
+    for segment, rows in hits.groupby("segment", sort=False):
+        wanted = set(rows["record_no"])
+        for record_no, record in enumerate(iter_segment(os.path.join(archive_dir, segment))):
+            if record_no in wanted:
+                records.append(record)
+    return sorted(records, key=lambda r: r["fetched_at"])
+
+
+def reextract_dataset(source, output_filename, archive_dir=ARCHIVE_DIR):
+    """
+    สร้าง CSV ใหม่จาก archive โดยไม่ต้องยิง network (ใช้ mapping เดียวกับตัว scraper)
+
+    Args:
+        source (str): 'paginated' หรือ 'detail'
+        output_filename (str): ไฟล์ CSV ปลายทาง
+        archive_dir (str): โฟลเดอร์ archive
+
+    Returns:
+        pd.DataFrame: ข้อมูลที่ extract ได้ (ตัด id ซ้ำโดยเก็บตัวที่ fetch ล่าสุด)
+    """
+    if source == "paginated":
+        from Helper.scraping_Paginated import extract_job_info
+    elif source == "detail":
+        from Helper.scraping_Detail import extract_job_info
+    else:
+        raise ValueError(f"Unknown archive source '{source}', expected one of {SOURCES}")
+
+    start = time.perf_counter()
+    all_job_data = []
+    skipped = 0
+    for record in iter_archive(archive_dir, source):
+        items = record["data"].get("items", []) if source == "paginated" else [record["data"]]
+        for item in items:
+            # response ถูกเก็บก่อน extract จึงอาจมีตัวที่ extract ไม่ผ่านตอน scrape -> ข้ามทีละตัวเหมือน scraper
+            try:
+                all_job_data.append(extract_job_info(item, record["url"]))
+            except Exception as e:
+                skipped += 1
+                opening_id = item.get("openingId") if isinstance(item, dict) else None
+                print(f"[ERR] ID {opening_id} ({record['url']}): Extraction failed - {e}")
+
+    df = pd.DataFrame(all_job_data)
+    if not df.empty:
+        df = df.drop_duplicates(subset=["id"], keep="last").reset_index(drop=True)
+        df.to_csv(output_filename, index=False, encoding="utf-8-sig")
+
+    print(f"Re-extracted {len(df)} records ({skipped} skipped) from {source} archive in {time.perf_counter() - start:.2f}s -> {output_filename}")
+    return df
+
+
+class ReplayResponse:
+    """Response จำลองที่มี interface เท่าที่ scraper ใช้ (status_code, json())"""
+
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class ArchiveReplay:
+    """
+    เสิร์ฟ response จาก archive แทน requests.get (ใช้ทดสอบ scraper แบบ offline)
+
+    ถ้า URL เดียวกันถูก fetch หลายครั้ง จะตอบด้วยตัวล่าสุด และ URL ที่ไม่เคยเก็บไว้จะได้ 404
+    """
+
+    def __init__(self, archive_dir=ARCHIVE_DIR, source=None):
+        self.responses = {}
+        for record in iter_archive(archive_dir, source):
+            self.responses[record["url"]] = record["data"]
+        print(f"Replay loaded {len(self.responses)} archived responses from {archive_dir}")
+
+    def get(self, url, headers=None, timeout=None):
+        if url in self.responses:
+            return ReplayResponse(200, self.responses[url])
+        return ReplayResponse(404)
+
+
+if __name__ == "__main__":
+    # python -m Helper.archive reextract --source detail --output cedt_intern_data_detail.csv
+    parser = argparse.ArgumentParser(description="Rebuild datasets from the raw response archive.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reextract_parser = subparsers.add_parser("reextract", help="Rebuild a CSV from archived responses")
+    reextract_parser.add_argument("--source", choices=SOURCES, required=True)
+    reextract_parser.add_argument("--output", required=True)
+    reextract_parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+
+    args = parser.parse_args()
+    if args.command == "reextract":
+        reextract_dataset(args.source, args.output, args.archive_dir)
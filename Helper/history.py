@@ -0,0 +1,281 @@
+import gzip
+import json
+import math
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+HISTORY_FILENAME = "scrape_history.json.gz"
+HISTORY_FIELDS = ["inStudentDraftCount", "quota", "salary_amount"]
+SECONDS_PER_DAY = 86400
+LOCK_TIMEOUT = 30
+LOCK_STALE_AFTER = 120
+
+
+def _empty_history():
+    """
+    โครงสร้างของ history store (ทุกอย่างถูก encode ให้ค่าที่ไม่เปลี่ยนแทบไม่กินพื้นที่)
+
+    - scrape_deltas: เวลาของแต่ละ scrape (epoch seconds) แบบ delta encoding
+    - openings[id]["seen"]: run-length ของ scrape index ที่เจอ opening นี้ [[start, length], ...]
+    - openings[id][field]: run-length ของค่าในแต่ละ snapshot ที่เจอ [[value, count], ...]
+    """
+    return {"version": 1, "scrape_deltas": [], "last_scrape_at": None, "openings": {}}
+
+
+def load_history(path=HISTORY_FILENAME):
+    """โหลด history store (ถ้ายังไม่มีไฟล์จะได้ store ว่าง)"""
+    if not os.path.exists(path):
+        return _empty_history()
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@contextmanager
+def history_lock(path=HISTORY_FILENAME):
+    """
+    Lock ไฟล์ history ข้าม process (สร้าง {path}.lock แบบ O_EXCL ใช้ได้ทั้ง Windows และ Linux)
+
+    ใช้ครอบ load -> แก้ไข -> save เพื่อไม่ให้ scrape ที่รันพร้อมกันเขียนทับ snapshot ของกันและกัน
+    lock ที่ค้างเกิน LOCK_STALE_AFTER วินาที (process ตายกลางคัน) จะถูกลบทิ้ง
+    """
+    lock_path = f"{path}.lock"
+    deadline = time.time() + LOCK_TIMEOUT
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_AFTER:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.time() > deadline:
+                raise TimeoutError(f"Could not acquire history lock {lock_path}")
+            time.sleep(0.1)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+
+def save_history(history, path=HISTORY_FILENAME):
+    """บันทึกแบบ atomic (เขียนไฟล์ชั่วคราวแล้ว os.replace) กันไฟล์พังถ้าโปรแกรมหยุดกลางคัน"""
+    tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(history, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _to_json_value(value):
+    """แปลงค่าจาก DataFrame เป็นค่าที่เก็บใน JSON ได้ (NaN -> None, 3.0 -> 3)"""
+    if value is None:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(value):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def append_snapshot(history, df, scraped_at=None):
+    """
+    เพิ่ม snapshot ของทุก opening ใน df ลง history (แก้ไข history in-place)
+
+    Args:
+        history (dict): store จาก load_history
+        df (pd.DataFrame): ผลการ scrape แบบ paginated (ต้องมี 'id' และทุก field ใน HISTORY_FIELDS)
+        scraped_at (float, optional): เวลา scrape (epoch seconds), default = ตอนนี้
+    """
+    # detail API ไม่มี inStudentDraftCount -> ไม่รับ เพื่อไม่ให้เกิด run ของ None และ scrape index ที่ทำให้ seen run ขาด
+    missing = [field for field in HISTORY_FIELDS if field not in df.columns]
+    if missing:
+        raise ValueError(f"Snapshot is missing history fields {missing}; record paginated scrape results only")
+
+    scraped_at = int(scraped_at if scraped_at is not None else time.time())
+    last = history["last_scrape_at"]
+    history["scrape_deltas"].append(scraped_at if last is None else scraped_at - last)
+    history["last_scrape_at"] = scraped_at
+    scrape_idx = len(history["scrape_deltas"]) - 1
+
+    snapshot = df.dropna(subset=["id"]).drop_duplicates(subset=["id"], keep="last")
+    columns = {field: snapshot[field].tolist() for field in HISTORY_FIELDS}
+
+    for row_idx, opening_id in enumerate(snapshot["id"].tolist()):
+        key = str(int(opening_id))
+        opening = history["openings"].setdefault(key, {"seen": [], **{field: [] for field in HISTORY_FIELDS}})
+
+        # scrape ติดกันเพียงแค่ต่อความยาว run เดิม
+        seen = opening["seen"]
+        if seen and seen[-1][0] + seen[-1][1] == scrape_idx:
+            seen[-1][1] += 1
+        else:
+            seen.append([scrape_idx, 1])
+
+        # ค่าเดิมซ้ำ -> เพิ่ม count ของ run เดิม
+        for field in HISTORY_FIELDS:
+            value = _to_json_value(columns[field][row_idx])
+            runs = opening[field]
+            if runs and runs[-1][0] == value:
+                runs[-1][1] += 1
+            else:
+                runs.append([value, 1])
+
+    return history
+
+
+def record_snapshot(df, path=HISTORY_FILENAME, scraped_at=None):
+    """โหลด history, เพิ่ม snapshot จากผลการ scrape แบบ paginated แล้วบันทึกกลับ (ถือ lock ตลอด)"""
+    with history_lock(path):
+        history = load_history(path)
+        append_snapshot(history, df, scraped_at)
+        save_history(history, path)
+    print(f"History: recorded {len(df)} openings (scrape #{len(history['scrape_deltas'])}) -> {path}")
+    return history
+
+
+def scrape_times(history):
+    """Decode เวลาของทุก scrape (epoch seconds) จาก delta encoding"""
+    return np.cumsum(np.asarray(history["scrape_deltas"], dtype=np.float64))
+
+
+def opening_series(history, opening_id, field="inStudentDraftCount", times=None):
+    """
+    Decode time series ของ opening หนึ่ง
+
+    Args:
+        times (np.ndarray, optional): ผลของ scrape_times(history) ส่งมาเมื่อ decode หลาย opening จะได้ไม่ต้อง cumsum ซ้ำ
+
+    Returns:
+        tuple: (times, values) เป็น np.ndarray ของ epoch seconds และค่า (ไม่รวม snapshot ที่ค่าเป็น None)
+    """
+    opening = history["openings"].get(str(int(opening_id)))
+    if opening is None or not opening["seen"]:
+        return np.array([], dtype=np.float64), np.array([], dtype=np.float64)
+
+    if times is None:
+        times = scrape_times(history)
+
+    # decode run-length ด้วย np.repeat: index = start ของ run + offset ภายใน run
+    seen_starts = np.array([start for start, _ in opening["seen"]], dtype=np.intp)
+    seen_lengths = np.array([length for _, length in opening["seen"]], dtype=np.intp)
+    run_offsets = np.arange(seen_lengths.sum()) - np.repeat(np.cumsum(seen_lengths) - seen_lengths, seen_lengths)
+    seen_idx = np.repeat(seen_starts, seen_lengths) + run_offsets
+
+    run_values = np.array([np.nan if v is None else v for v, _ in opening[field]], dtype=np.float64)
+    run_counts = np.array([c for _, c in opening[field]], dtype=np.intp)
+    values = np.repeat(run_values, run_counts)
+
+    series_times = times[seen_idx]
+    valid = ~np.isnan(values)
+    return series_times[valid], values[valid]
+
+
+def history_metrics(history, df, now=None):
+    """
+    คำนวณ trend ของ inStudentDraftCount ต่อ opening เพื่อใช้ rank ในแท็บ Bookmark
+
+    Decode ทุก opening ครั้งเดียวแล้วคำนวณ regression ของทุก opening พร้อมกันด้วย np.bincount
+
+    Args:
+        history (dict): store จาก load_history
+        df (pd.DataFrame): DataFrame ที่ merge แล้ว (ใช้ 'id', 'quota', 'End Date', 'inStudentDraftCount')
+            ต้องส่ง inStudentDraftCount ก่อน fillna เพื่อให้แถวที่ไม่มีค่าใช้ snapshot ล่าสุดจาก history แทน
+        now (float, optional): เวลาอ้างอิง (epoch seconds), default = ตอนนี้
+
+    Returns:
+        pd.DataFrame: index เดียวกับ df มี column
+            history_points  - จำนวน snapshot ที่มี draft count
+            draft_trend_per_day - slope (least squares) ของ draft count ต่อวัน
+            draft_growth_rate   - อัตราเพิ่มแบบสัดส่วนต่อวัน เทียบกับ snapshot แรก
+            projected_ratio     - draft count ที่คาดว่าจะถึง ณ End Date หารด้วย quota
+    """
+    now = time.time() if now is None else now
+    n = len(df)
+    times = scrape_times(history)
+
+    # 1. Decode series ของทุก opening แล้วต่อกันเป็น array เดียว (group = ตำแหน่งแถวใน df)
+    groups, all_days, all_counts = [], [], []
+    for pos, opening_id in enumerate(df["id"].tolist()):
+        if pd.isna(opening_id):
+            continue
+        series_times, counts = opening_series(history, opening_id, times=times)
+        if len(counts):
+            groups.append(np.full(len(counts), pos, dtype=np.intp))
+            all_days.append((series_times - times[0]) / SECONDS_PER_DAY)
+            all_counts.append(counts)
+
+    points = np.zeros(n, dtype=np.intp)
+    trend = np.zeros(n, dtype=np.float64)
+    growth = np.zeros(n, dtype=np.float64)
+    latest = np.full(n, np.nan, dtype=np.float64)
+
+    if groups:
+        group = np.concatenate(groups)
+        days = np.concatenate(all_days)
+        counts = np.concatenate(all_counts)
+
+        # 2. Least squares slope ต่อ group: (nΣty - ΣtΣy) / (nΣt² - (Σt)²)
+        k = np.bincount(group, minlength=n).astype(np.float64)
+        sum_t = np.bincount(group, days, minlength=n)
+        sum_y = np.bincount(group, counts, minlength=n)
+        sum_tt = np.bincount(group, days * days, minlength=n)
+        sum_ty = np.bincount(group, days * counts, minlength=n)
+        denom = k * sum_tt - sum_t * sum_t
+
+        # series ของแต่ละ opening เรียงตามเวลาอยู่แล้ว -> ตัวแรก/ตัวสุดท้ายของแต่ละ group
+        is_first = np.r_[True, group[1:] != group[:-1]]
+        is_last = np.r_[group[1:] != group[:-1], True]
+        first_day = np.zeros(n)
+        first_day[group[is_first]] = days[is_first]
+        first_count = np.zeros(n)
+        first_count[group[is_first]] = counts[is_first]
+        span = np.zeros(n)
+        span[group[is_last]] = days[is_last] - first_day[group[is_last]]
+        latest[group[is_last]] = counts[is_last]
+
+        has_trend = (k >= 2) & (span > 0) & (denom > 0)
+        points = k.astype(np.intp)
+        trend[has_trend] = (k * sum_ty - sum_t * sum_y)[has_trend] / denom[has_trend]
+        growth[has_trend] = (latest - first_count)[has_trend] / np.maximum(first_count, 1.0)[has_trend] / span[has_trend]
+
+    # ใช้ค่าปัจจุบันจาก df ถ้ามี ไม่งั้นใช้ snapshot ล่าสุดใน history
+    if "inStudentDraftCount" in df.columns:
+        current = pd.to_numeric(df["inStudentDraftCount"], errors="coerce").to_numpy(dtype=np.float64)
+        current = np.where(np.isnan(current), latest, current)
+    else:
+        current = latest
+    current = np.nan_to_num(current, nan=0.0)
+
+    # quota เหมือน student_draft_ratio: ค่าว่างเป็น 1 แต่ quota 0 ยังหารเป็น inf ให้ทั้งสอง metric ตรงกัน
+    quota = pd.to_numeric(df["quota"], errors="coerce").fillna(1).to_numpy(dtype=np.float64)
+
+    if "End Date" in df.columns:
+        end_date = pd.to_datetime(df["End Date"], errors="coerce", utc=True)
+        seconds_left = (end_date - pd.Timestamp(now, unit="s", tz="UTC")).dt.total_seconds().to_numpy(dtype=np.float64)
+        days_left = np.clip(np.nan_to_num(seconds_left, nan=0.0), 0, None) / SECONDS_PER_DAY
+    else:
+        days_left = np.zeros(n, dtype=np.float64)
+
+    # draft count ไม่ลดลงในทางปฏิบัติ จึงไม่ project trend ที่ติดลบ
+    projected = current + np.clip(trend, 0, None) * days_left
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        projected_ratio = projected / quota
+
+    return pd.DataFrame({
+        "history_points": points,
+        "draft_trend_per_day": trend,
+        "draft_growth_rate": growth,
+        "projected_ratio": projected_ratio,
+    }, index=df.index)
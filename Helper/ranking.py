@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+
+# ลำดับ column ของ feature matrix (ทุก column ถูก normalize ให้อยู่ใน [0, 1] และ "ยิ่งมากยิ่งดี")
+RANK_CRITERIA = ["salary", "competition", "quota", "work_type", "tags"]
+
+DEFAULT_WEIGHTS = {
+    "salary": 1.0,
+    "competition": 1.0,
+    "quota": 0.3,
+    "work_type": 0.5,
+    "tags": 0.5,
+}
+
+
+def _min_max(values):
+    """Scale an array to [0, 1]; NaN/±inf becomes 0 and a constant column becomes 1."""
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.isfinite(values)
+    out = np.zeros(len(values), dtype=np.float64)
+    if not valid.any():
+        return out
+
+    lo = values[valid].min()
+    hi = values[valid].max()
+    if hi > lo:
+        out[valid] = (values[valid] - lo) / (hi - lo)
+    else:
+        out[valid] = 1.0
+    return out
+
+
+def split_tags(df):
+    """
+    แยก column 'tags' ("a, b, c") ออกเป็นแถวละ tag
+
+    Returns:
+        pd.Series: tag แต่ละตัว โดย index ชี้กลับไปที่แถวของ df
+    """
+    if 'tags' not in df.columns:
+        return pd.Series(dtype=object)
+    tags = df['tags'].fillna('').astype(str).str.split(', ').explode().str.strip()
+    return tags[tags != '']
+
+
+def build_rank_features(df, preferred_work_types=None, preferred_tags=None, ratio_column='student_draft_ratio'):
+    """
+    สร้าง feature matrix สำหรับการจัดอันดับ (Ranking)
+
+    Args:
+        df (pd.DataFrame): DataFrame ที่ merge แล้ว (ต้องมี salary_amount, quota และ ratio_column)
+        preferred_work_types (list, optional): work_type ที่ต้องการ (ได้ 1 ถ้าตรง, 0 ถ้าไม่ตรง)
+        preferred_tags (list, optional): tags ที่ต้องการ (คะแนน = สัดส่วน tag ที่ตรง)
+        ratio_column (str): column ที่ใช้วัดการแข่งขัน (ยิ่งต่ำยิ่งดี)
+
+    Returns:
+        np.ndarray: matrix ขนาด (len(df), len(RANK_CRITERIA)) เรียงตาม RANK_CRITERIA
+    """
+    n = len(df)
+    features = np.zeros((n, len(RANK_CRITERIA)), dtype=np.float64)
+
+    salary = pd.to_numeric(df['salary_amount'], errors='coerce').to_numpy(dtype=np.float64)
+    features[:, 0] = _min_max(salary)
+
+    # competition: กลับด้าน ratio เพื่อให้ตำแหน่งที่คนแย่งน้อยได้คะแนนสูง
+    # ค่าว่างหรือ inf (quota = 0) ถือว่าแข่งขันสูงสุด -> ได้ 0 และไม่ถูกนำไปคิด min/max
+    ratio = pd.to_numeric(df[ratio_column], errors='coerce').to_numpy(dtype=np.float64)
+    competition = 1.0 - _min_max(ratio)
+    competition[~np.isfinite(ratio)] = 0.0
+    features[:, 1] = competition
+
+    # quota ใช้ log1p เพื่อไม่ให้บริษัทที่รับเยอะมาก ๆ กลบ criteria อื่น
+    quota = pd.to_numeric(df['quota'], errors='coerce').to_numpy(dtype=np.float64)
+    features[:, 2] = _min_max(np.log1p(np.clip(quota, 0, None)))
+
+    if preferred_work_types:
+        features[:, 3] = df['work_type'].isin(preferred_work_types).to_numpy(dtype=np.float64)
+
+    if preferred_tags:
+        tags = split_tags(df.reset_index(drop=True))
+        matched = tags.isin(preferred_tags).groupby(level=0).sum()
+        tag_score = np.zeros(n, dtype=np.float64)
+        tag_score[matched.index.to_numpy()] = matched.to_numpy(dtype=np.float64)
+        features[:, 4] = tag_score / len(preferred_tags)
+
+    return features
+
+
+def weights_to_vector(weights):
+    """แปลง dict ของ weights เป็น vector ตามลำดับ RANK_CRITERIA (key ที่ไม่มีถือเป็น 0)"""
+    return np.array([float(weights.get(name, 0.0)) for name in RANK_CRITERIA], dtype=np.float64)
+
+
+def prepare_ranking(df, preferred_work_types=None, preferred_tags=None, ratio_column='student_draft_ratio'):
+    """
+    เตรียม state สำหรับ ranking แบบ incremental (เก็บไว้ใน st.session_state ได้)
+
+    Returns:
+        dict: {"features", "weights", "scores"} โดย scores เริ่มต้นเป็น 0 (weights = 0)
+    """
+    features = build_rank_features(df, preferred_work_types, preferred_tags, ratio_column)
+    return {
+        "features": features,
+        "weights": np.zeros(len(RANK_CRITERIA), dtype=np.float64),
+        "scores": np.zeros(len(df), dtype=np.float64),
+    }
+
+
+def update_ranking_weights(state, weights):
+    """
+    อัปเดตคะแนนเมื่อ weights เปลี่ยน โดยคำนวณเฉพาะ column ที่ weight เปลี่ยนจริง
+
+    score = features @ weights จึงอัปเดตแบบ delta ได้:
+    scores += features[:, changed] @ (new - old)[changed]
+
+    Args:
+        state (dict): state จาก prepare_ranking (ถูกแก้ไข in-place)
+        weights (dict): weights ใหม่ เช่น {"salary": 1.0, "competition": 0.5}
+
+    Returns:
+        np.ndarray: คะแนนของทุกแถว
+    """
+    new_weights = weights_to_vector(weights)
+    delta = new_weights - state["weights"]
+    changed = np.flatnonzero(delta)
+
+    if len(changed) == len(RANK_CRITERIA):
+        # เปลี่ยนทุก column -> คำนวณใหม่ทั้งหมดในรอบเดียว (กัน error สะสมจาก floating point)
+        state["scores"] = state["features"] @ new_weights
+    elif len(changed) > 0:
+        state["scores"] += state["features"][:, changed] @ delta[changed]
+
+    state["weights"] = new_weights
+    return state["scores"]
+
+
+def select_top_k(scores, k, mask=None):
+    """
+    เลือก k อันดับแรกด้วย np.argpartition (O(n)) แล้ว sort เฉพาะ k ตัวนั้น
+
+    Args:
+        scores (np.ndarray): คะแนนของทุกแถว
+        k (int): จำนวนที่ต้องการ
+        mask (np.ndarray, optional): boolean array ของแถวที่ผ่าน hard filter
+
+    Returns:
+        np.ndarray: positional index ของแถวที่ได้ เรียงจากคะแนนมากไปน้อย
+    """
+    candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(scores))
+    k = min(int(k), len(candidates))
+    if k <= 0:
+        return np.array([], dtype=np.intp)
+
+    candidate_scores = scores[candidates]
+    if k < len(candidates):
+        part = np.argpartition(-candidate_scores, k - 1)[:k]
+    else:
+        part = np.arange(len(candidates))
+
+    order = part[np.argsort(-candidate_scores[part], kind='stable')]
+    return candidates[order]
+
+
+def pareto_frontier(salary, ratio, mask=None):
+    """
+    หา Pareto frontier ของ salary (ยิ่งมากยิ่งดี) กับ ratio (ยิ่งน้อยยิ่งดี)
+
+    เรียงตาม salary มากไปน้อยแล้วใช้ running minimum ของ ratio:
+    แถวใดที่ ratio ต่ำกว่าทุกแถวที่ salary สูงกว่า/เท่ากัน จะไม่ถูก dominate
+    แถวแรกหลังเรียง (salary สูงสุด, ratio ต่ำสุดในกลุ่มนั้น) อยู่บน frontier เสมอ แม้ ratio เป็น inf
+    แถวที่ (salary, ratio) เท่ากันทุกประการไม่ dominate กันเอง จึงอยู่บน frontier ทั้งกลุ่ม (ไม่ตัดตัวซ้ำ)
+    แถวที่ salary ไม่ใช่ค่า finite หรือ ratio เป็น NaN จะถูกตัดออก
+
+    Args:
+        salary (array-like): เงินเดือน (฿/day)
+        ratio (array-like): student_draft_ratio หรือ ratio ที่ใช้วัดการแข่งขัน
+        mask (np.ndarray, optional): boolean array ของแถวที่ผ่าน hard filter
+
+    Returns:
+        np.ndarray: positional index ของแถวบน frontier เรียงตาม salary มากไปน้อย
+    """
+    salary = np.asarray(salary, dtype=np.float64)
+    ratio = np.asarray(ratio, dtype=np.float64)
+
+    valid = np.isfinite(salary) & ~np.isnan(ratio)
+    if mask is not None:
+        valid &= np.asarray(mask, dtype=bool)
+    candidates = np.flatnonzero(valid)
+    if len(candidates) == 0:
+        return np.array([], dtype=np.intp)
+
+    # lexsort ใช้ key ตัวสุดท้ายเป็น primary: salary มากไปน้อย, ratio น้อยไปมาก
+    order = np.lexsort((ratio[candidates], -salary[candidates]))
+    sorted_salary = salary[candidates][order]
+    sorted_ratio = ratio[candidates][order]
+
+    strictly_better = np.empty(len(sorted_ratio), dtype=bool)
+    strictly_better[0] = True
+    strictly_better[1:] = sorted_ratio[1:] < np.minimum.accumulate(sorted_ratio)[:-1]
+
+    # แถวที่ (salary, ratio) ซ้ำกับแถวก่อนหน้าใช้ผลของแถวแรกในกลุ่มเดียวกัน
+    new_pair = np.empty(len(sorted_ratio), dtype=bool)
+    new_pair[0] = True
+    new_pair[1:] = (sorted_salary[1:] != sorted_salary[:-1]) | (sorted_ratio[1:] != sorted_ratio[:-1])
+    pair_group = np.cumsum(new_pair) - 1
+    on_frontier = strictly_better[new_pair][pair_group]
+    return candidates[order[on_frontier]]
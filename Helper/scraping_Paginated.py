@@ -6,9 +6,36 @@ import random
 import os
 import streamlit as st
 
-def scraping_Paginated(Start_Page=1, End_Page=16, Limit=20, Output_Filename="cedt_intern_data_paginated.csv", cookie_value=None):
+from Helper.archive import ArchiveReplay, ArchiveWriter
+from Helper.history import record_snapshot
+
+def extract_job_info(item, url):
+    """Map one item of the paginated API response to a CSV row (also used for archive re-extraction)"""
+    # Mapping ข้อมูลให้ชื่อ Column ตรงกับไฟล์ CSV เก่า
+    return {
+        "id": item.get("openingId"),
+        "company_nameTh": item.get("company", {}).get("companyNameTh"),
+        "company_nameEn": item.get("company", {}).get("companyNameEn"),
+        "position_title": item.get("title"),
+        "quota": item.get("quota"),
+        "salary_amount": item.get("compensationAmount"),
+        # จัดการกรณี salary_type อาจเป็น None
+        "salary_type": item.get("compensationType", {}).get("compensationType") if item.get("compensationType") else None,
+        "work_type": item.get("workingCondition"),
+        "location": item.get("officeName"),
+        # รวม Tags
+        "Start Date": item.get("startDate"),
+        "End Date": item.get("endDate"),
+        "inStudentDraftCount": item.get("inStudentDraftCount"),
+        "tags": ", ".join([t['tagName'] for t in item.get("tags", [])]),
+        "description_html": item.get("description"),
+        "api_url": url  # เก็บ URL หน้า list ไว้เป็น reference
+    }
+
+def scraping_Paginated(Start_Page=1, End_Page=16, Limit=20, Output_Filename="cedt_intern_data_paginated.csv", cookie_value=None, archive_dir=None, replay_dir=None):
     print(f"Cookie loaded: {cookie_value[:50]}..." if cookie_value else "Cookie is None!")
-    if not cookie_value:
+    # โหมด replay อ่านจาก archive อย่างเดียว จึงไม่ต้องใช้ Cookie
+    if not cookie_value and not replay_dir:
         raise ValueError("COOKIE not found in .env file!")
 
     # ==========================================
@@ -31,6 +58,10 @@ def scraping_Paginated(Start_Page=1, End_Page=16, Limit=20, Output_Filename="ced
     all_job_data = []
     temp_log = []
 
+    # replay_dir: ใช้ response จาก archive แทน network / archive_dir: เก็บ raw response ทุกหน้า
+    fetch = ArchiveReplay(replay_dir, source="paginated").get if replay_dir else requests.get
+    archive = ArchiveWriter(archive_dir, source="paginated") if archive_dir and not replay_dir else None
+
     # ==========================================
     # 2. เริ่มการวนลูปทีละหน้า (Pagination Loop)
     # ==========================================
@@ -39,69 +70,56 @@ def scraping_Paginated(Start_Page=1, End_Page=16, Limit=20, Output_Filename="ced
     idx = 0
     progress_bar = st.progress(0)
 
-    for page in range(START_PAGE, END_PAGE + 1):
-        # สร้าง URL โดยใส่เลขหน้าและ limit
-        url = API_URL_TEMPLATE.format(page, LIMIT)
+    # ปิด archive ใน finally เสมอ (Streamlit stop/rerun เป็น BaseException) ให้ segment และ index ครบ
+    try:
+        for page in range(START_PAGE, END_PAGE + 1):
+            # สร้าง URL โดยใส่เลขหน้าและ limit
+            url = API_URL_TEMPLATE.format(page, LIMIT)
         
-        try:
-            print(f"Fetching Page {page}...", end=" ")
-            response = requests.get(url, headers=HEADERS, timeout=10)
+            try:
+                print(f"Fetching Page {page}...", end=" ")
+                response = fetch(url, headers=HEADERS, timeout=10)
             
-            if response.status_code == 200:
-                data = response.json()
-                items = data.get("items", [])
+                if response.status_code == 200:
+                    data = response.json()
+                    items = data.get("items", [])
+                    if archive:
+                        archive.write(url, data, [item.get("openingId") for item in items])
                 
-                temp_log.append(f"[PAGE {page}] Found {len(items)} items.")
+                    temp_log.append(f"[PAGE {page}] Found {len(items)} items.")
                 
-                # วนลูปดึงข้อมูลย่อยในแต่ละ Page (Iterate items in page)
-                for item in items:
-                    # Mapping ข้อมูลให้ชื่อ Column ตรงกับไฟล์ CSV เก่า
-                    job_info = {
-                        "id": item.get("openingId"),
-                        "company_nameTh": item.get("company", {}).get("companyNameTh"),
-                        "company_nameEn": item.get("company", {}).get("companyNameEn"),
-                        "position_title": item.get("title"),
-                        "quota": item.get("quota"),
-                        "salary_amount": item.get("compensationAmount"),
-                        # จัดการกรณี salary_type อาจเป็น None
-                        "salary_type": item.get("compensationType", {}).get("compensationType") if item.get("compensationType") else None,
-                        "work_type": item.get("workingCondition"),
-                        "location": item.get("officeName"),
-                        # รวม Tags
-                        "Start Date": item.get("startDate"),
-                        "End Date": item.get("endDate"),
-                        "inStudentDraftCount": item.get("inStudentDraftCount"),
-                        "tags": ", ".join([t['tagName'] for t in item.get("tags", [])]),
-                        "description_html": item.get("description"),
-                        "api_url": url  # เก็บ URL หน้า list ไว้เป็น reference
-                    }
-                    
-                    all_job_data.append(job_info)
+                    # วนลูปดึงข้อมูลย่อยในแต่ละ Page (Iterate items in page)
+                    for item in items:
+                        all_job_data.append(extract_job_info(item, url))
                     
-            else:
-                temp_log.append(f"[ERR] Page {page}: Status {response.status_code}")
-
-            # แสดงความคืบหน้า
-            progress_bar.progress((idx + 1) / (END_PAGE - START_PAGE + 1))
-            idx += 1
-            if len(temp_log) >= 5:
-                log_entry = ''
-                for log_i in temp_log:
-                    log_entry += log_i + ", "    
-                st.write(log_entry)
-                print(log_entry)
-                temp_log = []
-
-        except Exception as e:
-            st.error(f"Exception occurred: {e}")
-            print(f"[ERR] Exception: {e}")
-
-        # ==========================================
-        # 3. หน่วงเวลาแบบสุ่ม (Random Delay)
-        # ==========================================
-        # แม้จะยิงน้อยครั้ง แต่ควรหน่วงเวลาเล็กน้อยเพื่อความปลอดภัย
-        delay = random.uniform(2.0, 3.0)
-        time.sleep(delay)
+                else:
+                    temp_log.append(f"[ERR] Page {page}: Status {response.status_code}")
+
+                # แสดงความคืบหน้า
+                progress_bar.progress((idx + 1) / (END_PAGE - START_PAGE + 1))
+                idx += 1
+                if len(temp_log) >= 5:
+                    log_entry = ''
+                    for log_i in temp_log:
+                        log_entry += log_i + ", "    
+                    st.write(log_entry)
+                    print(log_entry)
+                    temp_log = []
+
+            except Exception as e:
+                st.error(f"Exception occurred: {e}")
+                print(f"[ERR] Exception: {e}")
+
+            # ==========================================
+            # 3. หน่วงเวลาแบบสุ่ม (Random Delay)
+            # ==========================================
+            # แม้จะยิงน้อยครั้ง แต่ควรหน่วงเวลาเล็กน้อยเพื่อความปลอดภัย (replay ไม่ต้องหน่วง)
+            if not replay_dir:
+                delay = random.uniform(2.0, 3.0)
+                time.sleep(delay)
+    finally:
+        if archive:
+            archive.close()
 
     for log_i in temp_log:
         log_entry += log_i + " "    
@@ -117,6 +135,10 @@ def scraping_Paginated(Start_Page=1, End_Page=16, Limit=20, Output_Filename="ced
         
         # บันทึกไฟล์
         df.to_csv(OUTPUT_FILENAME, index=False, encoding='utf-8-sig')
+
+        # เก็บ snapshot ของ draft count / quota / salary ไว้ดู trend (replay เป็นข้อมูลเก่า จึงไม่บันทึก)
+        if not replay_dir:
+            record_snapshot(df)
         
         print(f"Scraping Finished! Total jobs collected: {len(df)}")
         print(f"Saved to: {OUTPUT_FILENAME}")
@@ -0,0 +1,133 @@
+import json
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.ipc
+import streamlit as st
+
+SHARED_DIR = "shared_dataset"
+CURRENT_FILENAME = "CURRENT"
+KEEP_VERSIONS = 3
+
+
+def _version_path(version, shared_dir=SHARED_DIR):
+    return os.path.join(shared_dir, f"dataset_v{version}.arrow")
+
+
+def current_version(shared_dir=SHARED_DIR):
+    """อ่าน version ที่ publish ล่าสุดจากไฟล์ CURRENT (None ถ้ายังไม่เคย publish)"""
+    try:
+        with open(os.path.join(shared_dir, CURRENT_FILENAME), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish_dataset(df, sources=None, shared_dir=SHARED_DIR):
+    """
+    Publish DataFrame เป็น dataset version ใหม่ (Arrow IPC file) ให้ทุก session/process ใช้ร่วมกัน
+
+    ไฟล์ของแต่ละ version เขียนครั้งเดียวแล้วไม่แก้อีก และสลับ version ด้วย os.replace ของไฟล์ CURRENT
+    (atomic) ทำให้ผู้อ่านเห็นแค่ version เก่าหรือใหม่ที่สมบูรณ์ ไม่มีทางเห็นไฟล์ที่เขียนไม่เสร็จ
+
+    Args:
+        df (pd.DataFrame): dataset ที่ merge และเตรียม column แล้ว
+        sources (list, optional): ไฟล์ CSV ที่ใช้สร้าง dataset นี้ (เก็บไว้ใน metadata)
+        shared_dir (str): โฟลเดอร์เก็บ dataset
+
+    Returns:
+        str: version ที่ publish
+    """
+    os.makedirs(shared_dir, exist_ok=True)
+    version = str(time.time_ns())
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"sources"] = json.dumps(list(sources or [])).encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+
+    path = _version_path(version, shared_dir)
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+    current_tmp = os.path.join(shared_dir, f"{CURRENT_FILENAME}.{version}.tmp")
+    with open(current_tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(current_tmp, os.path.join(shared_dir, CURRENT_FILENAME))
+
+    _prune_versions(shared_dir)
+    print(f"Published shared dataset v{version}: {len(df)} rows -> {path}")
+    return version
+
+
+def _prune_versions(shared_dir=SHARED_DIR):
+    """ลบ version เก่าเหลือไว้ KEEP_VERSIONS ตัว (process ที่ยัง map ไฟล์เก่าอยู่บน Linux/macOS ยังอ่านได้ปกติ)"""
+    versions = sorted(
+        int(name[len("dataset_v"):-len(".arrow")])
+        for name in os.listdir(shared_dir)
+        if name.startswith("dataset_v") and name.endswith(".arrow")
+    )
+    for version in versions[:-KEEP_VERSIONS]:
+        try:
+            os.remove(_version_path(version, shared_dir))
+        except OSError:
+            # Windows ไม่ให้ลบไฟล์ที่ยังถูก map อยู่ -> ลบรอบหน้า
+            pass
+
+
+@st.cache_resource(max_entries=KEEP_VERSIONS, show_spinner=False)
+def _open_version(path):
+    """
+    Memory-map ไฟล์ของ version หนึ่งครั้งเดียวต่อ process แล้วแชร์ DataFrame ให้ทุก session
+
+    Column ตัวเลขที่ไม่มีค่าว่างจะชี้ไปที่ memory map ตรง ๆ (zero-copy, read-only)
+    ห้ามแก้ไข DataFrame ที่ได้ ถ้าต้องการแก้ให้ .copy() ก่อน
+    """
+    source = pa.memory_map(path, "r")
+    table = pa.ipc.open_file(source).read_all()
+    sources = json.loads((table.schema.metadata or {}).get(b"sources", b"[]"))
+    return table.to_pandas(split_blocks=True), sources
+
+
+def load_shared_dataset(shared_dir=SHARED_DIR):
+    """
+    โหลด dataset version ปัจจุบัน (ควรเรียกครั้งเดียวต่อการ rerun เพื่อให้ทั้งหน้าใช้ version เดียวกัน)
+
+    Returns:
+        tuple: (version, df, sources) หรือ (None, None, []) ถ้ายังไม่เคย publish
+    """
+    for _ in range(3):
+        version = current_version(shared_dir)
+        if version is None:
+            return None, None, []
+        try:
+            df, sources = _open_version(_version_path(version, shared_dir))
+            return version, df, sources
+        except OSError:
+            # version ถูก prune ระหว่างอ่าน CURRENT -> อ่าน CURRENT ใหม่
+            continue
+    return None, None, []
+
+
+def republish_with_source(new_source, shared_dir=SHARED_DIR):
+    """
+    Publish version ใหม่หลัง scrape: merge ไฟล์ของ version ปัจจุบันรวมกับไฟล์ที่เพิ่ง scrape
+
+    Returns:
+        str: version ใหม่ หรือ None ถ้าไม่มีข้อมูลให้ publish
+    """
+    from Helper.Visualize import prepare_dataset
+
+    _, _, sources = load_shared_dataset(shared_dir)
+    sources = [path for path in sources if os.path.exists(path) and path != new_source]
+    if os.path.exists(new_source):
+        sources.append(new_source)
+
+    df = prepare_dataset(sources)
+    if df.empty:
+        return None
+    return publish_dataset(df, sources, shared_dir)
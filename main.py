@@ -20,10 +20,15 @@ st.set_page_config(
 # ==========================================
 # Session State Initialization
 # ==========================================
-if 'df' not in st.session_state:
-    st.session_state.df = None
 if 'scraping_done' not in st.session_state:
     st.session_state.scraping_done = False
+
+# ==========================================
+# Shared Dataset (memory-mapped once per process, shared by every session)
+# ==========================================
+# โหลดครั้งเดียวต่อ rerun เพื่อให้ทุกแท็บเห็น version เดียวกัน
+from Helper.shared_dataset import load_shared_dataset, publish_dataset, republish_with_source
+dataset_version, shared_df, dataset_sources = load_shared_dataset()
     
 # ==========================================
 # UI Layout
@@ -42,6 +47,19 @@ tab1, tab2, tab3 = st.tabs(["Search Intern Positions",
                             "Bookmark Positions"])
 
 with tab1:
+    # ==========================================
+    # Raw Response Archive Options
+    # ==========================================
+    from Helper.archive import ARCHIVE_DIR
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        archive_raw = st.checkbox("Archive raw API responses", value=True, help=f"Store every raw response in '{ARCHIVE_DIR}/' for offline re-extraction")
+    with col2:
+        replay_archive = st.checkbox("Replay from archive (offline)", value=False, help="Serve archived responses instead of calling the API")
+    archive_dir = ARCHIVE_DIR if archive_raw else None
+    replay_dir = ARCHIVE_DIR if replay_archive else None
+    
     # ==========================================
     # Scraping Section Paginated
     # ==========================================
@@ -60,12 +78,23 @@ with tab1:
 
     if st.button("Start Scraping paginated"):
         from Helper.scraping_Paginated import scraping_Paginated
+        scraped = False
         try:
-            scraping_Paginated(Start_Page=start_page, End_Page=end_page, Limit=limit, Output_Filename=output_filename, cookie_value=cookie)
+            scraping_Paginated(Start_Page=start_page, End_Page=end_page, Limit=limit, Output_Filename=output_filename, cookie_value=cookie, archive_dir=archive_dir, replay_dir=replay_dir)
             st.success(f"Scraping completed! Data saved to {output_filename}")
             st.session_state.scraping_done = True
+            scraped = True
         except Exception as e:
             st.error(f"An error occurred during scraping: {e}")
+        
+        # Publish แยกจาก try ของการ scrape เพื่อไม่ให้ publish ล้มเหลวถูกรายงานว่า scrape ล้มเหลว
+        if scraped:
+            try:
+                if republish_with_source(output_filename):
+                    dataset_version, shared_df, dataset_sources = load_shared_dataset()
+                    st.info(f"Published shared dataset from {len(dataset_sources)} file(s).")
+            except Exception as e:
+                st.error(f"Scraping succeeded, but publishing the shared dataset failed: {e}")
 
     st.markdown("---")
 
@@ -85,12 +114,46 @@ with tab1:
         output_filename = st.text_input("Output Filename", value="cedt_intern_data_detail.csv")
     if st.button("Start Scraping detail"):
         from Helper.scraping_Paginated import scraping_Paginated
+        scraped = False
         try:
-            scraping_Detail(Start_ID=start_id, End_ID=end_id, Output_Filename=output_filename, cookie_value=cookie)
+            scraping_Detail(Start_ID=start_id, End_ID=end_id, Output_Filename=output_filename, cookie_value=cookie, archive_dir=archive_dir, replay_dir=replay_dir)
             st.success(f"Scraping completed! Data saved to {output_filename}")
             st.session_state.scraping_done = True
+            scraped = True
         except Exception as e:
             st.error(f"An error occurred during scraping: {e}")
+        
+        # Publish แยกจาก try ของการ scrape เพื่อไม่ให้ publish ล้มเหลวถูกรายงานว่า scrape ล้มเหลว
+        if scraped:
+            try:
+                if republish_with_source(output_filename):
+                    dataset_version, shared_df, dataset_sources = load_shared_dataset()
+                    st.info(f"Published shared dataset from {len(dataset_sources)} file(s).")
+            except Exception as e:
+                st.error(f"Scraping succeeded, but publishing the shared dataset failed: {e}")
+
+    st.markdown("---")
+    
+    # ==========================================
+    # Re-extraction Section (Offline)
+    # ==========================================
+    st.title("Rebuild Dataset from Archive")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        archive_source = st.selectbox("Archive Source", ["paginated", "detail"])
+    with col2:
+        reextract_filename = st.text_input("Output Filename", value=f"cedt_intern_data_{archive_source}_archive.csv", key="reextract_filename")
+    if st.button("Rebuild from Archive"):
+        from Helper.archive import reextract_dataset
+        try:
+            rebuilt_df = reextract_dataset(archive_source, reextract_filename, ARCHIVE_DIR)
+            if rebuilt_df.empty:
+                st.warning(f"No archived {archive_source} responses found in '{ARCHIVE_DIR}/'.")
+            else:
+                st.success(f"Rebuilt {len(rebuilt_df)} records into {reextract_filename}")
+        except Exception as e:
+            st.error(f"An error occurred during re-extraction: {e}")
 
     st.markdown("---")
     
@@ -106,34 +169,28 @@ with tab2:
         selected_files = st.multiselect("Select CSV files", csv_files)
         
         if st.button("Merge and Visualize"):
-            from Helper.Visualize import merge_and_deduplicate_data
+            from Helper.Visualize import prepare_dataset
 
             if selected_files:
-                # Merge and deduplicate data
-                merged_df = merge_and_deduplicate_data(selected_files)
-                st.session_state.df = merged_df
-                
-                # create column student_draft_ratio
-                merged_df['inStudentDraftCount'] = merged_df['inStudentDraftCount'].fillna(0)
-                merged_df['quota'] = merged_df['quota'].fillna(1)  # เติม 1 เพื่อหลีกเลี่ยงการหารด้วยศูนย์
-                merged_df['student_draft_ratio'] = merged_df['inStudentDraftCount']/merged_df['quota']
+                # Merge, deduplicate and publish as the shared dataset for every session
+                merged_df = prepare_dataset(selected_files)
+                if merged_df.empty:
+                    st.warning("No data could be loaded from the selected files.")
+                else:
+                    publish_dataset(merged_df, selected_files)
+                    dataset_version, shared_df, dataset_sources = load_shared_dataset()
                 
-                # Normalize salary_amount to per day if salary_type indicates monthly or fixed
-                mask = merged_df['salary_type'].str.contains('บาท/เดือน', na=False, case=False) | merged_df['salary_type'].str.contains('เหมาจ่าย', na=False, case=False)
-                merged_df.loc[mask, 'salary_amount'] = merged_df.loc[mask, 'salary_amount'] / 22
-                merged_df.loc[mask, 'salary_amount'] = merged_df.loc[mask, 'salary_amount'].round(0)
+                    st.success(f"Merged {len(selected_files)} files with {len(merged_df)} unique entries.")
                 
-                st.success(f"Merged {len(selected_files)} files with {len(merged_df)} unique entries.")
+                    # Display DataFrame
+                    st.dataframe(merged_df)
                 
-                # Display DataFrame
-                st.dataframe(merged_df)
-                
-                # Visualization
-                from Helper.Visualize import log_data_stats
-                log_data_stats(merged_df, 'salary_amount')
-                st.markdown("---")
-                log_data_stats(merged_df, 'student_draft_ratio')
-                st.markdown("---")
+                    # Visualization
+                    from Helper.Visualize import log_data_stats
+                    log_data_stats(merged_df, 'salary_amount')
+                    st.markdown("---")
+                    log_data_stats(merged_df, 'student_draft_ratio')
+                    st.markdown("---")
             else:
                 st.warning("Please select at least one CSV file to merge.")
     else :
@@ -156,12 +213,23 @@ with tab3:
         st.session_state.work_type = []
     if 'show_filtered' not in st.session_state:
         st.session_state.show_filtered = False
+    if 'selection_mode' not in st.session_state:
+        st.session_state.selection_mode = "Filter Only"
+    if 'rank_weights' not in st.session_state:
+        from Helper.ranking import DEFAULT_WEIGHTS
+        st.session_state.rank_weights = dict(DEFAULT_WEIGHTS)
+    if 'rank_top_k' not in st.session_state:
+        st.session_state.rank_top_k = 20
+    if 'rank_state' not in st.session_state:
+        st.session_state.rank_state = None
+        st.session_state.rank_state_key = None
     
     # Check if merged_df exists
-    if st.session_state.df is None:
+    if shared_df is None:
         st.warning("⚠️ Please merge data in 'Data Visualization & Bookmarking' tab first!")
     else:
-        merged_df = st.session_state.df
+        merged_df = shared_df
+        st.caption(f"Shared dataset v{dataset_version} ({len(merged_df)} positions from {', '.join(dataset_sources)})")
         
         # Create three columns for filters
         col1, col2, col3 = st.columns(3)
@@ -210,41 +278,132 @@ with tab3:
                 key="work_type_select"
             )
         
-        # Apply filters
-        filtered_df = merged_df.copy()
-        filtered_df = filtered_df[
-            (filtered_df['student_draft_ratio'] <= st.session_state.student_draft_ratio) &
-            (filtered_df['salary_amount'] >= st.session_state.min_salary) &
-            (filtered_df['salary_amount'] <= st.session_state.max_salary)
-        ]
+        # Apply filters (hard thresholds -> boolean mask over merged_df)
+        filter_mask = (
+            (merged_df['student_draft_ratio'] <= st.session_state.student_draft_ratio) &
+            (merged_df['salary_amount'] >= st.session_state.min_salary) &
+            (merged_df['salary_amount'] <= st.session_state.max_salary)
+        )
         
         if st.session_state.work_type:
-            filtered_df = filtered_df[filtered_df['work_type'].isin(st.session_state.work_type)]
+            filter_mask &= merged_df['work_type'].isin(st.session_state.work_type)
+        
+        filtered_df = merged_df[filter_mask]
+        selected_df = filtered_df
+        
+        # ==========================================
+        # Ranking (Top-K / Pareto Frontier)
+        # ==========================================
+        st.subheader("🏆 Rank Positions")
+        st.session_state.selection_mode = st.radio(
+            "Selection Mode",
+            ["Filter Only", "Top-K Ranking", "Pareto Frontier"],
+            index=["Filter Only", "Top-K Ranking", "Pareto Frontier"].index(st.session_state.selection_mode),
+            horizontal=True,
+            key="selection_mode_radio"
+        )
+        
+        # Competition metric: current ratio or ratio projected to End Date from scrape history
+        ratio_options = ['student_draft_ratio'] + (['projected_ratio'] if 'projected_ratio' in merged_df.columns else [])
+        ratio_column = 'student_draft_ratio'
+        if st.session_state.selection_mode != "Filter Only":
+            ratio_column = st.radio(
+                "Competition Metric",
+                ratio_options,
+                format_func=lambda c: "Projected ratio at End Date" if c == 'projected_ratio' else "Current student/draft ratio",
+                horizontal=True,
+                key="ratio_column_radio"
+            )
+        
+        if st.session_state.selection_mode == "Top-K Ranking":
+            from Helper.ranking import RANK_CRITERIA, prepare_ranking, update_ranking_weights, select_top_k, split_tags
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                preferred_work_types = st.multiselect(
+                    "Preferred Work Types",
+                    options=work_type_options,
+                    key="rank_work_type_select"
+                )
+            with col2:
+                preferred_tags = st.multiselect(
+                    "Preferred Tags",
+                    options=sorted(split_tags(merged_df).unique().tolist()),
+                    key="rank_tags_select"
+                )
+            with col3:
+                st.session_state.rank_top_k = st.number_input(
+                    "Top K",
+                    min_value=1,
+                    value=st.session_state.rank_top_k,
+                    step=1,
+                    key="rank_top_k_input"
+                )
+            
+            weight_cols = st.columns(len(RANK_CRITERIA))
+            for weight_col, name in zip(weight_cols, RANK_CRITERIA):
+                with weight_col:
+                    st.session_state.rank_weights[name] = st.slider(
+                        f"Weight: {name}",
+                        min_value=0.0,
+                        max_value=2.0,
+                        value=float(st.session_state.rank_weights[name]),
+                        step=0.1,
+                        key=f"rank_weight_{name}"
+                    )
+            
+            # Features ถูกสร้างใหม่เฉพาะตอนที่ dataset หรือ preferences เปลี่ยน
+            # ถ้าแค่ขยับ weights จะอัปเดตคะแนนแบบ incremental
+            rank_state_key = (dataset_version, tuple(preferred_work_types), tuple(preferred_tags), ratio_column)
+            if st.session_state.rank_state_key != rank_state_key:
+                st.session_state.rank_state = prepare_ranking(merged_df, preferred_work_types, preferred_tags, ratio_column)
+                st.session_state.rank_state_key = rank_state_key
+            
+            scores = update_ranking_weights(st.session_state.rank_state, st.session_state.rank_weights)
+            top_positions = select_top_k(scores, st.session_state.rank_top_k, filter_mask.to_numpy())
+            selected_df = merged_df.iloc[top_positions].assign(rank_score=scores[top_positions])
+        
+        elif st.session_state.selection_mode == "Pareto Frontier":
+            from Helper.ranking import pareto_frontier
+            
+            frontier_positions = pareto_frontier(
+                pd.to_numeric(merged_df['salary_amount'], errors='coerce'),
+                pd.to_numeric(merged_df[ratio_column], errors='coerce'),
+                filter_mask.to_numpy()
+            )
+            selected_df = merged_df.iloc[frontier_positions]
+            st.caption("Positions where no other position pays more with a lower competition ratio.")
         
         # Button to toggle display
         col1, col2 = st.columns([3, 1])
         with col1:
-            st.write(f"**Found: {len(filtered_df)} / {len(merged_df)} positions**")
+            st.write(f"**Found: {len(filtered_df)} / {len(merged_df)} positions, selected: {len(selected_df)}**")
         with col2:
             if st.button("🔍 Show Filtered", key="show_button"):
                 st.session_state.show_filtered = not st.session_state.show_filtered
         
         # Display table only if button is clicked
         if st.session_state.show_filtered:
-            st.subheader(f"Filtered Positions ({len(filtered_df)} found)")
+            st.subheader(f"Selected Positions ({len(selected_df)} found)")
             
-            display_cols = ['id', 'company_nameTh', 'position_title', 'salary_amount', 
-                        'work_type', 'student_draft_ratio', 'quota']
+            # แสดงเฉพาะ column ที่มีจริง (dataset จาก detail API ไม่มีบาง column)
+            display_cols = [col for col in ['id', 'company_nameTh', 'position_title', 'salary_amount', 
+                                            'work_type', 'student_draft_ratio', 'quota',
+                                            'projected_ratio', 'draft_trend_per_day', 'rank_score']
+                            if col in selected_df.columns]
             st.dataframe(
-                filtered_df[display_cols].style.format({
+                selected_df[display_cols].style.format({
                     'salary_amount': '{:,.0f}฿',
-                    'student_draft_ratio': '{:.2f}'
+                    'student_draft_ratio': '{:.2f}',
+                    'projected_ratio': '{:.2f}',
+                    'draft_trend_per_day': '{:+.2f}',
+                    'rank_score': '{:.3f}'
                 }),
                 use_container_width=True,
                 height=400
             )
         
-        bookmarked_id_list = filtered_df['id'].tolist()
+        bookmarked_id_list = selected_df['id'].tolist()
         
         st.markdown("---")
         st.subheader(f"📌 Bookmark Positions: {len(bookmarked_id_list)} found")